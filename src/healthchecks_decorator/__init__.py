@@ -1,5 +1,6 @@
 """Healthchecks Decorator."""
+from .decorator import batch_pings
 from .decorator import healthcheck
 
 
-__all__ = ["healthcheck"]
+__all__ = ["batch_pings", "healthcheck"]
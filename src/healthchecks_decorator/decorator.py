@@ -1,14 +1,29 @@
 """Healthchecks Decorator."""
+import asyncio
+import inspect
 import logging
+import os
+import socket
+import string
+import threading
+import time
 import typing as t
-from dataclasses import dataclass
+from collections.abc import Mapping
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from contextvars import ContextVar
+from functools import lru_cache
 from functools import partial
 from functools import wraps
+from http.client import BadStatusLine
+from http.client import HTTPConnection
+from http.client import HTTPException
+from http.client import HTTPSConnection
+from importlib import metadata
 from os import getenv
 from urllib.parse import urlencode
-from urllib.parse import urlparse
-from urllib.parse import urlunparse
-from urllib.request import urlopen
+from urllib.parse import urlsplit
 
 WrappedFn = t.TypeVar("WrappedFn", bound=t.Callable[..., t.Any])
 
@@ -18,83 +33,296 @@ log.addHandler(logging.NullHandler())
 
 ENV_VAR_PREFIX = "HEALTHCHECK"
 VALID_URL_SCHEMES = ("http", "https")
+_VALID_SCHEMES = frozenset(VALID_URL_SCHEMES)
+_URL_PREFIXES = tuple(f"{scheme}://" for scheme in VALID_URL_SCHEMES)
+
+
+def _getenv(name: str) -> t.Optional[str]:
+    """Return the env var for an option (e.g. 'send_start' => 'HEALTHCHECK_SEND_START')."""
+    return getenv(f"{ENV_VAR_PREFIX}_{name.upper()}") or None
+
+
+# Env var values parsed as True, once stripped and lowercased
+_TRUTHY = frozenset(("true", "1"))
+
+
+def _getenv_flag(name: str) -> bool:
+    """Return a boolean option from its env var: 'true' (in any case) or '1'."""
+    envvar_value = _getenv(name)
+    return envvar_value is not None and envvar_value.strip().lower() in _TRUTHY
+
+
+def _is_valid_url(url: t.Any) -> bool:
+    """Return True for an HTTP(S) URL with a netloc, logging why it is invalid otherwise."""
+    if not url:
+        log.warning("Missing URL")
+        return False
+
+    if not isinstance(url, str):
+        log.warning("Invalid URL: %s", url)
+        return False
+
+    parsed_url = urlsplit(url)
+    if parsed_url.scheme not in _VALID_SCHEMES:
+        log.warning("Invalid URL scheme for URL: %s", url)
+        return False
+
+    if not parsed_url.netloc:
+        log.warning("Invalid netloc for URL: %s", url)
+        return False
+    return True
+
+
+@lru_cache(maxsize=256)
+def _build_sub_urls(url: str) -> t.Tuple[str, str]:
+    """Build the '/start' and '/fail' URLs, splitting the URL only once.
+
+    Only the path changes, so a plain string split is enough: the query and
+    fragment (e.g. '?create=1') are kept after the new path segment. Results
+    are cached, as the same URL is often used to decorate several functions.
+    """
+    url, fragment_sep, fragment = url.partition("#")
+    base, query_sep, query = url.partition("?")
+    prefix = base if base.endswith("/") else base + "/"
+    suffix = query_sep + query + fragment_sep + fragment
+    return prefix + "start" + suffix, prefix + "fail" + suffix
 
 
-@dataclass
 class HealthcheckConfig:
-    """Healthecheks config."""
-
-    url: t.Optional[str]
-    send_start: t.Optional[bool]
-    send_diagnostics: t.Optional[bool]
-
-    def _build_url_with_path(self, path: str) -> str:
-        """Build a sub URL."""
-        parsed_url = urlparse(self.url)
-        sep = "" if parsed_url.path.endswith("/") else "/"  # type: ignore
-        new_path = parsed_url.path + sep + path  # type: ignore
-        new_url = urlunparse(
-            (  # type: ignore
-                parsed_url.scheme,
-                parsed_url.netloc,
-                new_path,
-                parsed_url.params,
-                parsed_url.query,
-                parsed_url.fragment,
-            )
-        )
-        return new_url  # type: ignore
+    """Healthecheks config.
 
-    @property
-    def start_url(self) -> str:
-        """Return the start URL."""
-        return self._build_url_with_path("start")
+    Options not explicitly defined (None) are resolved once, from env vars or
+    defaults, so reading them later is a plain slot access.
+    """
 
-    @property
-    def fail_url(self) -> str:
-        """Return the fail URL."""
-        return self._build_url_with_path("fail")
+    __slots__ = (
+        "url",
+        "send_start",
+        "send_diagnostics",
+        "await_pings",
+        "start_url",
+        "fail_url",
+        "_valid",
+    )
+
+    def __init__(
+        self,
+        url: t.Optional[str],
+        send_start: t.Optional[bool],
+        send_diagnostics: t.Optional[bool],
+        await_pings: t.Optional[bool] = None,
+    ) -> None:
+        """Resolve the config combining explicit values, env vars and defaults."""
+        self.url = url if url is not None else _getenv("url")
+        self.send_start = (
+            send_start if send_start is not None else _getenv_flag("send_start")
+        )
+        self.send_diagnostics = (
+            send_diagnostics
+            if send_diagnostics is not None
+            else _getenv_flag("send_diagnostics")
+        )
+        self.await_pings = (
+            await_pings if await_pings is not None else _getenv_flag("await_pings")
+        )
+
+        self._valid = _is_valid_url(self.url)
+        self.start_url = ""
+        self.fail_url = ""
+        if self._valid:
+            self.start_url, self.fail_url = _build_sub_urls(t.cast(str, self.url))
 
     def __bool__(self) -> bool:
         """Return True if the config is valid, False otherwise."""
-        if not self.url:
-            logging.warning("Missing URL")
-            return False
+        return self._valid
+
+
+class _Endpoint(t.NamedTuple):
+    """A ping URL, split once into what `http.client` needs to request it."""
+
+    scheme: str
+    netloc: str
+    target: str
+
+
+@lru_cache(maxsize=256)
+def _parse_endpoint(url: str) -> _Endpoint:
+    """Split a URL into scheme, netloc and request target (path and query)."""
+    scheme, netloc, path, query, _ = urlsplit(url)
+    return _Endpoint(scheme, netloc, f"{path or '/'}?{query}" if query else path or "/")
+
+
+def _user_agent() -> str:
+    """Return the User-Agent header value, including the package version."""
+    try:
+        version = metadata.version("healthchecks-decorator")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"healthchecks-decorator/{version}"
+
+
+# HTTP/1.1 connections are persistent by default; being explicit also keeps
+# proxies and HTTP/1.0 servers from closing the socket after each ping.
+_GET_HEADERS = {"Connection": "keep-alive", "User-Agent": _user_agent()}
+_POST_HEADERS = {**_GET_HEADERS, "Content-Type": "application/x-www-form-urlencoded"}
+
+# Resolved addresses of ping hosts and when they expire, keyed by (host, port)
+_addrinfo_cache: t.Dict[t.Tuple[str, int], t.Tuple[float, t.List[t.Any]]] = {}
+_ADDRINFO_TTL = 300  # seconds
+
+
+def _create_connection(
+    address: t.Tuple[str, int],
+    timeout: t.Optional[float] = None,
+    source_address: t.Optional[t.Tuple[str, int]] = None,
+) -> socket.socket:
+    """Connect like `socket.create_connection`, but resolving each host only once.
+
+    The cached addresses expire after `_ADDRINFO_TTL`, and they are dropped when
+    none of them accepts a connection, so a host that moved is resolved again.
+
+    Args:
+        address (Tuple[str, int]): Host and port to connect to.
+        timeout (float, optional): Socket timeout in seconds. Defaults to None.
+        source_address (Tuple[str, int], optional): Local address to bind to. Defaults to None.
+
+    Returns:
+        socket.socket: The connected socket.
 
+    Raises:
+        OSError: If no address accepts the connection.
+    """
+    expires, addrinfo = _addrinfo_cache.get(address, (0.0, []))
+    if expires <= time.monotonic():
+        addrinfo = socket.getaddrinfo(*address, type=socket.SOCK_STREAM)
+        _addrinfo_cache[address] = (time.monotonic() + _ADDRINFO_TTL, addrinfo)
+
+    for index, (family, socktype, proto, _, sockaddr) in enumerate(addrinfo, 1):
+        sock = socket.socket(family, socktype, proto)
         try:
-            parsed_url = urlparse(self.url)
-
-            if parsed_url.scheme not in VALID_URL_SCHEMES:
-                logging.warning(f"Invalid URL scheme for URL: {self.url}")
-                return False
-
-            if not parsed_url.netloc:
-                logging.warning(f"Invalid netloc for URL: {self.url}")
-                return False
-            return True
-        except AttributeError:
-            logging.warning(f"Invalid URL: {self.url}")
-            return False
+            sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError:
+            sock.close()
+            if index == len(addrinfo):
+                _addrinfo_cache.pop(address, None)
+                raise
+
+    raise OSError(f"No address found for {address}")
+
+
+class _PreresolvedHTTPConnection(HTTPConnection):
+    """HTTP connection resolving its host once, not on every (re)connection."""
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Create the connection, using the cached name resolution."""
+        super().__init__(*args, **kwargs)
+        self._create_connection = _create_connection
+
+
+class _PreresolvedHTTPSConnection(HTTPSConnection, _PreresolvedHTTPConnection):
+    """HTTPS connection resolving its host once, not on every (re)connection."""
+
+
+# Idle keep-alive connections, keyed by (scheme, netloc). A connection is
+# popped while in use so concurrent pings never share a socket.
+_conn_cache: t.Dict[t.Tuple[str, str], t.List[HTTPConnection]] = {}
+_conn_lock = threading.Lock()
+_MAX_IDLE_CONNECTIONS = 4  # per host
 
-    def __getattribute__(self, name: str) -> t.Any:
-        """Overloaded to get info from environment variables or defaults when not defined."""
-        candidate = super().__getattribute__(name)
-
-        # [1] Return explicit values
-        if candidate is not None:
-            return candidate
-
-        # [2] Env vars
-        envvar_value = getenv(f"{ENV_VAR_PREFIX}_{name.upper()}")
-        if envvar_value:
-            return (
-                envvar_value
-                if name == "url"
-                else envvar_value.strip().lower() in ("true", "1")
-            )
 
-        # [3] Return default values
-        return None if name == "url" else False
+def _new_connection(
+    scheme: str, netloc: str, timeout: t.Optional[int]
+) -> HTTPConnection:
+    """Open a new (lazy) connection to the ping host."""
+    conn_cls = (
+        _PreresolvedHTTPSConnection if scheme == "https" else _PreresolvedHTTPConnection
+    )
+    return conn_cls(netloc, timeout=timeout)
+
+
+def _acquire_connection(
+    scheme: str, netloc: str, timeout: t.Optional[int]
+) -> t.Tuple[HTTPConnection, bool]:
+    """Return an idle connection for the host (or a new one) and whether it was reused."""
+    with _conn_lock:
+        idle = _conn_cache.get((scheme, netloc))
+        conn = idle.pop() if idle else None
+    if conn is None:
+        return _new_connection(scheme, netloc, timeout), False
+
+    # It may have been opened for a ping with another timeout
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+    return conn, True
+
+
+def _release_connection(scheme: str, netloc: str, conn: HTTPConnection) -> None:
+    """Return a connection to the idle cache so the next ping can reuse it.
+
+    Bursts of concurrent pings (e.g. `batch_pings`) open extra connections:
+    past `_MAX_IDLE_CONNECTIONS` per host, they are closed instead of kept.
+    """
+    with _conn_lock:
+        idle = _conn_cache.setdefault((scheme, netloc), [])
+        if len(idle) < _MAX_IDLE_CONNECTIONS:
+            idle.append(conn)
+            return
+    conn.close()
+
+
+# Errors of a keep-alive connection closed by the server while idle (including
+# RemoteDisconnected, a subclass of both of the first ones)
+_STALE_CONNECTION_ERRORS = (BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+
+def _send_request(
+    endpoint: _Endpoint,
+    timeout: t.Optional[int] = 10,
+    data: t.Optional[bytes] = None,
+) -> bool:
+    """Send a ping request over a cached keep-alive `http.client` connection.
+
+    The endpoint is parsed and validated once, by the decorator, not here.
+    A reused connection may have been closed by the server while idle, so that
+    failure is retried once, on a new connection, instead of being reported.
+    Other failures (e.g. timeouts) are not: the ping may have been received.
+
+    Args:
+        endpoint (_Endpoint): The check endpoint.
+        timeout (int, optional): Connection timeout in seconds. Defaults to 10.
+        data (bytes, optional): Optional diagnostic data. Defaults to None.
+
+    Returns:
+        bool: True if the request succeeded, False otherwise.
+    """
+    scheme, netloc, target = endpoint
+    method, headers = ("GET", _GET_HEADERS) if data is None else ("POST", _POST_HEADERS)
+
+    conn, reused = _acquire_connection(scheme, netloc, timeout)
+    while True:
+        try:
+            conn.request(method, target, body=data, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (HTTPException, OSError) as error:
+            conn.close()
+            if isinstance(error, OSError):
+                # The host may have moved, even if its old address still
+                # accepts connections (e.g. failing the TLS handshake)
+                _addrinfo_cache.pop((conn.host, conn.port), None)
+            if reused and isinstance(error, _STALE_CONNECTION_ERRORS):
+                conn, reused = _new_connection(scheme, netloc, timeout), False
+                continue
+            log.debug("Ping to %s://%s%s failed: %r", scheme, netloc, target, error)
+            return False
+
+        _release_connection(scheme, netloc, conn)
+        return response.status < 400
 
 
 def _http_request(
@@ -102,7 +330,7 @@ def _http_request(
     timeout: t.Optional[int] = 10,
     data: t.Optional[bytes] = None,
 ) -> bool:
-    """Send a ping request using standard library `urllib.parse.urlopen`.
+    """Send a ping request to an arbitrary endpoint, checking its scheme first.
 
     Args:
         endpoint (str): Full URL of the check.
@@ -111,23 +339,361 @@ def _http_request(
 
     Returns:
         bool: True if the request succeeded, False otherwise.
+
+    Raises:
+        ValueError: If the endpoint is not an HTTP(S) URL.
+    """
+    # Plain prefix check first: schemes are only lowercased when they don't match
+    if not (
+        endpoint.startswith(_URL_PREFIXES)
+        or endpoint[:8].lower().startswith(_URL_PREFIXES)
+    ):
+        raise ValueError(f"Unsupported URL scheme: {endpoint}")
+    return _send_request(_parse_endpoint(endpoint), timeout=timeout, data=data)
+
+
+def _new_executor() -> ThreadPoolExecutor:
+    """Return the executor sending pings off the caller's critical path.
+
+    It has a single worker, so pings are sent in the order they are submitted:
+    healthchecks.io keeps the last ping it receives, so e.g. the '/fail' ping of
+    a run must never arrive after the success ping of its retry. Its thread is
+    joined at interpreter exit, so pending pings are still delivered.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="hc-ping")
+
+
+_executor = _new_executor()
+# Bound on queued pings, so an unreachable server can't pile them up in memory
+_MAX_PENDING_PINGS = 1024
+_pending_slots = threading.BoundedSemaphore(_MAX_PENDING_PINGS)
+# Pings dropped since the queue last accepted one, to log drops only once
+_dropped_pings = 0
+
+
+def _reset_after_fork() -> None:
+    """Give a forked child process its own ping threads and connections.
+
+    Only the forking thread survives a fork, but the executor inherited from the
+    parent still counts its workers as running, so it would never start new ones
+    and pings submitted in the child would never be sent. Idle connections are
+    dropped too (not closed, as the parent still uses them): sharing a socket
+    would mix up both processes' requests and responses.
+    """
+    global _executor, _pending_slots, _dropped_pings, _conn_lock
+    _executor = _new_executor()
+    _pending_slots = threading.BoundedSemaphore(_MAX_PENDING_PINGS)
+    _dropped_pings = 0
+    _conn_lock = threading.Lock()
+    _conn_cache.clear()
+    _addrinfo_cache.clear()
+
+
+if hasattr(os, "register_at_fork"):  # pragma: no branch (not on Windows)
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _submit_ping(fn: t.Callable[..., bool], *args: t.Any) -> t.Optional["Future[bool]"]:
+    """Queue a ping on the background executor, or drop it if too many are pending.
+
+    Drops are logged once when they start, and once when pings are queued again,
+    so an outage doesn't flood the application's logs.
+
+    Args:
+        fn (Callable[..., bool]): The function sending the ping.
+        *args (Any): Its arguments.
+
+    Returns:
+        Future[bool], optional: The queued ping, or None when dropped.
     """
+    global _dropped_pings
+    if not _pending_slots.acquire(blocking=False):
+        if not _dropped_pings:
+            log.warning(
+                "Dropping pings: %d pings are already pending", _MAX_PENDING_PINGS
+            )
+        _dropped_pings += 1
+        return None
+    if _dropped_pings:
+        log.warning("Queueing pings again, after dropping %d", _dropped_pings)
+        _dropped_pings = 0
     try:
-        # Bandit will still complain, so S310 is omitted
-        urlopen(endpoint, data=data, timeout=timeout)  # noqa: S310
-        return True
-    except OSError:
-        return False
+        ping = _executor.submit(fn, *args)
+    except RuntimeError:  # the interpreter is shutting down (e.g. atexit handlers)
+        _pending_slots.release()
+        return _send_now(fn, *args)
+    ping.add_done_callback(lambda _: _pending_slots.release())
+    return ping
+
+
+def _send_now(fn: t.Callable[..., bool], *args: t.Any) -> "Future[bool]":
+    """Send a ping synchronously, when no thread can be started for it anymore."""
+    ping: "Future[bool]" = Future()
+    ping.set_result(fn(*args))
+    return ping
+
+
+def _http_request_after(
+    previous: t.Optional["Future[bool]"],
+    endpoint: _Endpoint,
+    data: t.Optional[bytes] = None,
+) -> bool:
+    """Send a ping request once the previous ping of the same run is done.
+
+    Waiting for the previous ping (i.e. '/start') guarantees healthchecks.io
+    receives the pings in order, even when they are sent from different
+    threads (i.e. a final ping buffered by `batch_pings`).
+
+    Args:
+        previous (Future[bool], optional): The previous ping, if any.
+        endpoint (_Endpoint): The check endpoint.
+        data (bytes, optional): Optional diagnostic data. Defaults to None.
+
+    Returns:
+        bool: True if the request succeeded, False otherwise.
+    """
+    if previous is not None:
+        previous.result()
+    return _send_request(endpoint, data=data)
+
+
+# (previous ping, endpoint, data) of the final pings buffered by `batch_pings`,
+# grouped by check (i.e. its ping endpoint) so each check's pings keep their order
+_PendingPing = t.Tuple[t.Optional["Future[bool]"], _Endpoint, t.Optional[bytes]]
+_pending_pings: ContextVar[
+    t.Optional[t.Dict[_Endpoint, t.List[_PendingPing]]]
+] = ContextVar("healthcheck_pending_pings", default=None)
+_MAX_BATCH_WORKERS = 20
+
+
+def _submit_final_ping(
+    check: _Endpoint,
+    previous: t.Optional["Future[bool]"],
+    endpoint: _Endpoint,
+    data: t.Optional[bytes] = None,
+) -> t.Optional["Future[bool]"]:
+    """Send the success/fail ping in the background, or buffer it within `batch_pings`.
+
+    Args:
+        check (_Endpoint): The ping endpoint of the check, identifying it.
+        previous (Future[bool], optional): The '/start' ping of the same run, if any.
+        endpoint (_Endpoint): The check endpoint.
+        data (bytes, optional): Optional diagnostic data. Defaults to None.
+
+    Returns:
+        Future[bool], optional: The queued ping, or None when buffered or dropped.
+    """
+    pending = _pending_pings.get()
+    if pending is not None:
+        pending.setdefault(check, []).append((previous, endpoint, data))
+        return None
+    return _submit_ping(_http_request_after, previous, endpoint, data)
+
+
+def _send_in_order(pings: t.List[_PendingPing]) -> bool:
+    """Send the buffered pings of a check one after another, returning if all succeeded."""
+    return all([_http_request_after(*ping) for ping in pings])
+
+
+class batch_pings:  # noqa: N801
+    """Buffer the success/fail pings of decorated calls and send them concurrently.
+
+    When many decorated functions run together (e.g. a scheduled sweep), their
+    final pings are sent in parallel when the block exits, instead of one after
+    another. The pings of a same check are still sent in order, so the last one
+    received by healthchecks.io is that of its last run. Pings within the block
+    are never awaited individually.
+
+    Example:
+        >>> with batch_pings():  # or `async with batch_pings():`
+        ...     pass  # run decorated functions
+    """
+
+    def __enter__(self) -> "batch_pings":
+        """Start buffering pings."""
+        self._token = _pending_pings.set({})
+        return self
+
+    def __exit__(self, *exc_info: t.Any) -> None:
+        """Send the buffered pings and wait for them."""
+        wait(self._flush())
+
+    async def __aenter__(self) -> "batch_pings":
+        """Start buffering pings."""
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info: t.Any) -> None:
+        """Send the buffered pings and wait for them without blocking the loop."""
+        await asyncio.gather(*map(asyncio.wrap_future, self._flush()))
+
+    def _flush(self) -> t.List["Future[bool]"]:
+        """Stop buffering and send the buffered pings of every check on its own thread."""
+        checks = _pending_pings.get() or {}
+        _pending_pings.reset(self._token)
+        if not checks:
+            return []
+
+        pool = ThreadPoolExecutor(
+            max_workers=min(len(checks), _MAX_BATCH_WORKERS),
+            thread_name_prefix="hc-batch",
+        )
+        try:
+            pings = [pool.submit(_send_in_order, group) for group in checks.values()]
+        except RuntimeError:  # the interpreter is shutting down
+            pings = [_send_now(_send_in_order, group) for group in checks.values()]
+        pool.shutdown(wait=False)
+        return pings
+
+
+# Types whose equal values always encode the same: unlike 1, 1.0 and True, which
+# are equal (so would share a cache entry) but are encoded differently.
+_CACHEABLE_TYPES = frozenset((str, int))
+
+
+@lru_cache(maxsize=32)
+def _encode_items(items: t.Tuple[t.Tuple[t.Any, t.Any], ...]) -> bytes:
+    """Encode diagnostics of plain strings and ints, often unchanged between runs."""
+    return urlencode(items, doseq=True).encode()
+
+
+# Characters left as they are by `urlencode`
+_SAFE_CHARS = frozenset(string.ascii_letters + string.digits + "_.-~")
+
+
+def _encode_diagnostics(diag: t.Any) -> bytes:
+    """Encode diagnostics as a form body, reusing the cached encoding when possible."""
+    if isinstance(diag, Mapping):
+        if len(diag) == 1:
+            # Most common shape (e.g. {"status": "ok"}): nothing to quote
+            ((key, value),) = diag.items()
+            if (
+                type(key) is str
+                and type(value) is str
+                and _SAFE_CHARS.issuperset(key)
+                and _SAFE_CHARS.issuperset(value)
+            ):
+                return f"{key}={value}".encode()
+        items = tuple(diag.items())
+        if all(
+            type(k) in _CACHEABLE_TYPES and type(v) in _CACHEABLE_TYPES
+            for k, v in items
+        ):
+            return _encode_items(items)
+        return urlencode(items, doseq=True).encode()
+    return urlencode(diag, doseq=True).encode()
 
 
 def _validate_diagnostics(diag: t.Any) -> t.Optional[bytes]:
     try:
-        return urlencode(diag).encode()
+        return _encode_diagnostics(diag)
     except TypeError as te:
-        log.warning(f"Ignoring diagnostics: {te}")
+        log.warning("Ignoring diagnostics: %s", te)
         return None
 
 
+def _endpoints(config: HealthcheckConfig) -> t.Tuple[_Endpoint, _Endpoint, _Endpoint]:
+    """Return the ping, '/start' and '/fail' endpoints of a valid config."""
+    # A valid config always has a URL: narrow it once here, not in the wrappers
+    ping_url: str = t.cast(str, config.url)
+    return (
+        _parse_endpoint(ping_url),
+        _parse_endpoint(config.start_url),
+        _parse_endpoint(config.fail_url),
+    )
+
+
+def _minimal_wrapper(
+    func: t.Callable[..., t.Any], config: HealthcheckConfig
+) -> t.Callable[..., t.Any]:
+    """Wrap a function for the default config: no '/start', no diagnostics, no awaiting."""
+    ping_endpoint, _, fail_endpoint = _endpoints(config)
+    # Every argument is known already: calls are plain argument-less calls
+    send_success = partial(_submit_final_ping, ping_endpoint, None, ping_endpoint)
+    send_fail = partial(_submit_final_ping, ping_endpoint, None, fail_endpoint)
+
+    @wraps(func)
+    def healthcheck_wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
+        try:
+            wrapped_result = func(*args, **kwargs)
+            send_success()
+            return wrapped_result
+        except Exception:
+            send_fail()
+            raise
+
+    return healthcheck_wrapper
+
+
+def _wrapper(
+    func: t.Callable[..., t.Any], config: HealthcheckConfig
+) -> t.Callable[..., t.Any]:
+    """Wrap a function for any config."""
+    ping_endpoint, start_endpoint, fail_endpoint = _endpoints(config)
+    do_send_start = config.send_start
+    do_send_diagnostics = config.send_diagnostics
+    do_await_pings = config.await_pings
+
+    @wraps(func)
+    def healthcheck_wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
+        start_ping = (
+            _submit_ping(_send_request, start_endpoint) if do_send_start else None
+        )
+
+        try:
+            wrapped_result = func(*args, **kwargs)
+            final_ping = _submit_final_ping(
+                ping_endpoint,
+                start_ping,
+                ping_endpoint,
+                _validate_diagnostics(wrapped_result) if do_send_diagnostics else None,
+            )
+            if do_await_pings and final_ping is not None:
+                final_ping.result()
+            return wrapped_result
+        except Exception:
+            final_ping = _submit_final_ping(ping_endpoint, start_ping, fail_endpoint)
+            if do_await_pings and final_ping is not None:
+                final_ping.result()
+            raise
+
+    return healthcheck_wrapper
+
+
+def _async_wrapper(
+    func: t.Callable[..., t.Awaitable[t.Any]], config: HealthcheckConfig
+) -> t.Callable[..., t.Awaitable[t.Any]]:
+    """Wrap a coroutine function for any config, without blocking the event loop."""
+    ping_endpoint, start_endpoint, fail_endpoint = _endpoints(config)
+    do_send_start = config.send_start
+    do_send_diagnostics = config.send_diagnostics
+    do_await_pings = config.await_pings
+
+    @wraps(func)
+    async def async_healthcheck_wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
+        start_ping = (
+            _submit_ping(_send_request, start_endpoint) if do_send_start else None
+        )
+
+        try:
+            wrapped_result = await func(*args, **kwargs)
+            final_ping = _submit_final_ping(
+                ping_endpoint,
+                start_ping,
+                ping_endpoint,
+                _validate_diagnostics(wrapped_result) if do_send_diagnostics else None,
+            )
+            if do_await_pings and final_ping is not None:
+                await asyncio.wrap_future(final_ping)
+            return wrapped_result
+        except Exception:
+            final_ping = _submit_final_ping(ping_endpoint, start_ping, fail_endpoint)
+            if do_await_pings and final_ping is not None:
+                await asyncio.wrap_future(final_ping)
+            raise
+
+    return async_healthcheck_wrapper
+
+
 @t.overload
 def healthcheck(func: WrappedFn) -> WrappedFn:  # noqa: D103
     pass
@@ -139,6 +705,8 @@ def healthcheck(  # noqa: D103
     url: t.Optional[str] = None,
     send_start: t.Optional[bool] = None,
     send_diagnostics: t.Optional[bool] = False,
+    await_pings: t.Optional[bool] = False,
+    disabled: t.Optional[bool] = False,
 ) -> t.Callable[[WrappedFn], WrappedFn]:
     pass
 
@@ -149,6 +717,8 @@ def healthcheck(
     url: t.Optional[str] = None,
     send_start: t.Optional[bool] = None,
     send_diagnostics: t.Optional[bool] = None,
+    await_pings: t.Optional[bool] = None,
+    disabled: t.Optional[bool] = None,
 ) -> t.Union[WrappedFn, t.Callable[[WrappedFn], WrappedFn]]:
     """Healthcheck decorator.
 
@@ -158,6 +728,10 @@ def healthcheck(
         send_start (bool, optional): Whether to send a '/start' signal. Defaults to False.
         send_diagnostics (bool, optional): When enabled, send the wrapped function returned value as
                                            diagnostics information. Defaults to False.
+        await_pings (bool, optional): When enabled, wait for the success/fail ping to be sent before
+                                      returning. Otherwise it is sent in the background. Defaults to False.
+        disabled (bool, optional): When enabled, return the function itself, undecorated, so it runs
+                                   with no overhead at all. Defaults to False.
 
     Returns:
         t.Union[WrappedFn, t.Callable[[WrappedFn], WrappedFn]]: A wrapped function.
@@ -170,35 +744,29 @@ def healthcheck(
                 url=url,
                 send_start=send_start,
                 send_diagnostics=send_diagnostics,
+                await_pings=await_pings,
+                disabled=disabled,
             ),
         )
 
+    if disabled if disabled is not None else _getenv_flag("disabled"):
+        return func
+
     # Resolve the config combining explicit values, env vars and defaults
     config: HealthcheckConfig = HealthcheckConfig(
-        url=url, send_diagnostics=send_diagnostics, send_start=send_start
+        url=url,
+        send_diagnostics=send_diagnostics,
+        send_start=send_start,
+        await_pings=await_pings,
     )
 
     if not config:
         log.warning("Disabling @healthcheck: invalid config")
         return func
 
-    @wraps(func)
-    def healthcheck_wrapper(*args: t.Any, **kwargs: t.Any) -> t.Any:
-        assert config.url is not None  # noqa: S101
-        if config.send_start:
-            _http_request(config.start_url)
-
-        try:
-            wrapped_result = func(*args, **kwargs)
-            _http_request(
-                config.url,
-                data=_validate_diagnostics(wrapped_result)
-                if config.send_diagnostics
-                else None,
-            )
-            return wrapped_result
-        except Exception as e:
-            _http_request(config.fail_url)
-            raise e
-
-    return t.cast(WrappedFn, healthcheck_wrapper)
+    # The config is fixed from now on: pick the wrapper doing only what it needs
+    if inspect.iscoroutinefunction(func):
+        return t.cast(WrappedFn, _async_wrapper(func, config))
+    if not (config.send_start or config.send_diagnostics or config.await_pings):
+        return t.cast(WrappedFn, _minimal_wrapper(func, config))
+    return t.cast(WrappedFn, _wrapper(func, config))
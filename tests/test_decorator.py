@@ -1,105 +1,206 @@
 """Test cases for the decorator module."""
+import asyncio
+import logging
+import os
+import random
 import socket
+import ssl
+import subprocess  # noqa: S404
+import sys
+import threading
+import time
 import typing as t
-from os import environ
+from concurrent.futures import Executor
+from concurrent.futures import Future
+from concurrent.futures import thread as futures_thread
+from concurrent.futures import wait
+from http.client import HTTPConnection
+from http.client import HTTPSConnection
+from http.client import LineTooLong
+from http.client import RemoteDisconnected
+from importlib import metadata
 from unittest.mock import call
+from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
 
+from healthchecks_decorator import batch_pings
+from healthchecks_decorator import decorator
 from healthchecks_decorator import healthcheck
+from healthchecks_decorator.decorator import _executor as ping_executor
+from healthchecks_decorator.decorator import _http_request
 from healthchecks_decorator.decorator import HealthcheckConfig
 
 
-@pytest.fixture
+T = t.TypeVar("T")
+
+
+class InlineExecutor(Executor):
+    """Executor running every task right away, to make ping assertions deterministic."""
+
+    def submit(
+        self, fn: t.Callable[..., T], /, *args: t.Any, **kwargs: t.Any
+    ) -> "Future[T]":
+        """Run the task and return its completed future."""
+        future: "Future[T]" = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def ping(target: str, data: t.Optional[bytes] = None) -> t.Any:
+    """Expected request on the mocked connection for a ping."""
+    if data is None:
+        return call("GET", target, body=None, headers=decorator._GET_HEADERS)
+    return call("POST", target, body=data, headers=decorator._POST_HEADERS)
+
+
+@pytest.fixture(scope="session")
 def url() -> str:
     """Valid ping URL fixture."""
     return "https://fake-hc.com/0000-1111-2222-3333"
 
 
-def test_minimal(url: str) -> None:
+@pytest.fixture(scope="session")
+def path() -> str:
+    """Request path of the `url` fixture."""
+    return "/0000-1111-2222-3333"
+
+
+@pytest.fixture
+def connection_factory(monkeypatch: pytest.MonkeyPatch) -> t.Iterator[MagicMock]:
+    """Patch the connection factory and drop any cached connection afterwards."""
+    factory = MagicMock()
+    factory.return_value.getresponse.return_value.status = 200
+    monkeypatch.setattr(decorator, "_new_connection", factory)
+    monkeypatch.setattr(decorator, "_executor", InlineExecutor())
+    yield factory
+    decorator._conn_cache.clear()
+
+
+@pytest.fixture
+def connection(connection_factory: MagicMock) -> MagicMock:
+    """Mocked keep-alive connection used for every ping."""
+    return t.cast(MagicMock, connection_factory.return_value)
+
+
+def test_minimal(url: str, path: str, connection: MagicMock) -> None:
     """Test minimal decorator."""
 
     @healthcheck(url=url)
     def function_to_wrap() -> bool:
         return True
 
-    with patch("healthchecks_decorator.decorator.urlopen") as urlopen_mock:
-        assert function_to_wrap()
-        urlopen_mock.assert_called_once_with(url, data=None, timeout=10)
+    assert function_to_wrap()
+    assert connection.request.call_args_list == [ping(path)]
 
 
-def test_minimalist(url: str) -> None:
+def test_minimalist(
+    url: str, path: str, connection: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test the most minimalist usage with env vars."""
-    environ["HEALTHCHECK_URL"] = url
+    monkeypatch.setenv("HEALTHCHECK_URL", url)
 
     @healthcheck
     def func() -> bool:
         return True
 
-    with patch("healthchecks_decorator.decorator.urlopen") as urlopen_mock:
-        assert func()
-        urlopen_mock.assert_called_once_with(url, data=None, timeout=10)
+    assert func()
+    assert connection.request.call_args_list == [ping(path)]
 
-    del environ["HEALTHCHECK_URL"]
 
-
-def test_with_send_start(url: str) -> None:
+def test_with_send_start(
+    url: str, path: str, connection_factory: MagicMock, connection: MagicMock
+) -> None:
     """Test sending a start signal."""
 
-    @healthcheck(url=url, send_start=True)
+    @healthcheck(url=url, send_start=True, await_pings=True)
     def function_with_arg(param: str) -> bool:
         return len(param) > 0
 
-    with patch("healthchecks_decorator.decorator.urlopen") as urlopen_mock:
-        assert function_with_arg("test")
-        expected_calls = [
-            call(f"{url}/start", data=None, timeout=10),
-            call(url, data=None, timeout=10),
-        ]
-        urlopen_mock.assert_has_calls(expected_calls)
+    assert function_with_arg("test")
+    expected_calls = [
+        ping(f"{path}/start"),
+        ping(path),
+    ]
+    connection.request.assert_has_calls(expected_calls)
+    # Both pings of the run go over the same keep-alive connection
+    connection_factory.assert_called_once()
 
 
-def test_exception(url: str) -> None:
-    """Test having an exception at urlopen."""
+def test_exception(
+    url: str, connection: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test having an exception when sending the ping."""
 
     @healthcheck(url=url)
     def function_with_failing_healthcheck() -> bool:
         return True
 
-    with patch("healthchecks_decorator.decorator.urlopen") as urlopen_mock:
-        urlopen_mock.side_effect = socket.error()
-        assert function_with_failing_healthcheck()
+    caplog.set_level(logging.DEBUG, logger="healthchecks_decorator")
+    connection.request.side_effect = socket.error()
+    assert function_with_failing_healthcheck()
+    assert caplog.records[-1].getMessage() == f"Ping to {url} failed: OSError()"
+
+    # Errors other than network and HTTP ones are bugs: they are not swallowed
+    connection.request.side_effect = TypeError()
+    with pytest.raises(TypeError):
+        _http_request(url)
 
 
-def test_wrapped_exception(url: str) -> None:
+@pytest.mark.parametrize("await_pings", [False, True])
+def test_wrapped_exception(
+    url: str, path: str, connection: MagicMock, await_pings: bool
+) -> None:
     """Test a failure scenario when the wrapped function raises an exception."""
 
-    @healthcheck(url=url)
+    @healthcheck(url=url, await_pings=await_pings)
     def function_that_raises_exception() -> bool:
         raise Exception("inner exception")
 
-    with patch("healthchecks_decorator.decorator.urlopen") as urlopen_mock:
-        with pytest.raises(Exception):
-            function_that_raises_exception()
-        urlopen_mock.assert_called_once_with(url + "/fail", data=None, timeout=10)
+    with pytest.raises(Exception):
+        function_that_raises_exception()
+    assert connection.request.call_args_list == [ping(path + "/fail")]
 
 
-def test_missing_url() -> None:
+def test_missing_url(connection_factory: MagicMock) -> None:
     """Test that nothing happens if the url is not defined (None or empty)."""
 
     def func() -> bool:
         return True
 
-    with patch("healthchecks_decorator.decorator.urlopen") as urlopen_mock:
-        assert healthcheck(url=None)(func)()
-        urlopen_mock.assert_not_called()
+    assert healthcheck(url=None)(func)()
+    connection_factory.assert_not_called()
 
-        assert healthcheck(url="")(func)()
-        urlopen_mock.assert_not_called()
+    assert healthcheck(url="")(func)()
+    connection_factory.assert_not_called()
 
+    # The function is returned undecorated, so calls have no overhead at all
+    assert healthcheck(url=None)(func) is func
+    assert healthcheck(url="")(func) is func
 
-def test_diagnostics(url: str) -> None:
+
+def test_disabled(
+    url: str, connection_factory: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a disabled decorator returns the function itself."""
+
+    def func() -> bool:
+        return True
+
+    assert healthcheck(url=url, disabled=True)(func) is func
+
+    monkeypatch.setenv("HEALTHCHECK_DISABLED", "1")
+    assert healthcheck(url=url)(func) is func
+    assert healthcheck(func) is func
+    # explicit settings + env vars => explicit settings
+    assert healthcheck(url=url, disabled=False)(func) is not func
+
+    assert func()
+    connection_factory.assert_not_called()
+
+
+def test_diagnostics(url: str, path: str, connection: MagicMock) -> None:
     """Test sending diagnostics."""
     diagnostics = {"foo": "bar"}
 
@@ -107,16 +208,558 @@ def test_diagnostics(url: str) -> None:
     def f(diag: t.Any) -> t.Any:
         return diag
 
-    with patch("healthchecks_decorator.decorator.urlopen") as urlopen_mock:
-        assert f(diagnostics) == diagnostics
-        expected_data = b"foo=bar"
-        urlopen_mock.assert_called_once_with(url, data=expected_data, timeout=10)
+    assert f(diagnostics) == diagnostics
+    assert connection.request.call_args_list == [ping(path, b"foo=bar")]
+    content_type = connection.request.call_args.kwargs["headers"]["Content-Type"]
+    assert content_type == "application/x-www-form-urlencoded"
+
+    # invalid diagnostics should not crash our wrapped func
+    connection.request.reset_mock()
+    invalid_diag = "not a valid non-string sequence or mapping object"
+    assert f(invalid_diag) == invalid_diag
+    assert connection.request.call_args_list == [ping(path)]
+
+
+@pytest.mark.parametrize(
+    "diag,expected,cached",
+    [
+        ({"foo": "bar", "n": 1}, b"foo=bar&n=1", True),
+        ({"status": "ok-1.0_~"}, b"status=ok-1.0_~", False),  # nothing to quote
+        ({"status": "not ok"}, b"status=not+ok", True),
+        ({"n": 1}, b"n=1", True),
+        ({"foo": ["bar", "baz"]}, b"foo=bar&foo=baz", False),  # unhashable
+        ({"ok": True, "n": 1.0}, b"ok=True&n=1.0", False),  # equal to 1, not cached
+        ([("foo", "bar")], b"foo=bar", False),
+    ],
+)
+def test_encode_diagnostics(diag: t.Any, expected: bytes, cached: bool) -> None:
+    """Test encoding diagnostics, caching mappings of strings and ints."""
+    assert decorator._encode_diagnostics(diag) == expected
+    hits = decorator._encode_items.cache_info().hits
+    assert decorator._encode_diagnostics(diag) == expected
+    assert decorator._encode_items.cache_info().hits == hits + cached
+
+
+def test_encode_diagnostics_types() -> None:
+    """Test that equal values encoded differently never share a cache entry."""
+    assert decorator._encode_diagnostics({"ok": 1}) == b"ok=1"
+    assert decorator._encode_diagnostics({"ok": True}) == b"ok=True"
+    assert decorator._encode_diagnostics({"ok": 1.0}) == b"ok=1.0"
+
+
+def test_async(url: str, path: str, connection: MagicMock) -> None:
+    """Test decorating a coroutine function."""
+
+    @healthcheck(url=url, send_start=True, send_diagnostics=True, await_pings=True)
+    async def coroutine(diag: t.Any) -> t.Any:
+        await asyncio.sleep(0)
+        return diag
+
+    assert asyncio.run(coroutine({"foo": "bar"})) == {"foo": "bar"}
+    expected_calls = [
+        ping(f"{path}/start"),
+        ping(path, b"foo=bar"),
+    ]
+    assert connection.request.call_args_list == expected_calls
+
+
+def test_async_wrapped_exception(url: str, path: str, connection: MagicMock) -> None:
+    """Test a coroutine function raising an exception."""
+
+    @healthcheck(url=url, send_start=True, await_pings=True)
+    async def coroutine_that_raises_exception() -> bool:
+        raise ValueError("inner exception")
+
+    with pytest.raises(ValueError):
+        asyncio.run(coroutine_that_raises_exception())
+    expected_calls = [
+        ping(f"{path}/start"),
+        ping(f"{path}/fail"),
+    ]
+    assert connection.request.call_args_list == expected_calls
+
+
+def test_async_without_start(url: str, path: str, connection: MagicMock) -> None:
+    """Test a coroutine function without start signal."""
+
+    @healthcheck(url=url)
+    async def coroutine() -> bool:
+        return True
+
+    @healthcheck(url=url)
+    async def coroutine_that_raises_exception() -> bool:
+        raise ValueError("inner exception")
+
+    assert asyncio.run(coroutine())
+    with pytest.raises(ValueError):
+        asyncio.run(coroutine_that_raises_exception())
+    expected_calls = [
+        ping(path),
+        ping(f"{path}/fail"),
+    ]
+    assert connection.request.call_args_list == expected_calls
+
+
+def test_background_pings(url: str, path: str, connection: MagicMock) -> None:
+    """Test that pings don't block the wrapped function unless awaited."""
+    release = threading.Event()
+    connection.request.side_effect = lambda *args, **kwargs: release.wait(5)
+    pings: t.List["Future[bool]"] = []
+
+    def submit(*args: t.Any, **kwargs: t.Any) -> "Future[bool]":
+        pings.append(ping_executor.submit(*args, **kwargs))
+        return pings[-1]
+
+    @healthcheck(url=url, send_start=True)
+    def job() -> bool:
+        return True
+
+    with patch("healthchecks_decorator.decorator._executor") as executor_mock:
+        executor_mock.submit.side_effect = submit
+        assert job()
+
+    # The job returned while both pings were still pending
+    assert len(pings) == 2
+    assert not any(ping.done() for ping in pings)
+
+    release.set()
+    wait(pings)
+    expected_calls = [
+        ping(f"{path}/start"),
+        ping(path),
+    ]
+    assert connection.request.call_args_list == expected_calls
+
 
-    with patch("healthchecks_decorator.decorator.urlopen") as urlopen_mock:
-        # invalid diagnostics should not crash our wrapped func
-        invalid_diag = "not a valid non-string sequence or mapping object"
-        assert f(invalid_diag) == invalid_diag
-        urlopen_mock.assert_called_once_with(url, data=None, timeout=10)
+def test_pings_order(
+    url: str, path: str, connection: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that pings of back-to-back calls arrive in order despite network jitter."""
+    monkeypatch.setattr(decorator, "_executor", ping_executor)
+    targets: t.List[str] = []
+
+    def request(method: str, target: str, **kwargs: t.Any) -> None:
+        time.sleep(random.uniform(0, 0.02))  # noqa: S311
+        targets.append(target)
+
+    connection.request.side_effect = request
+    runs = iter([False, True] * 5)
+
+    @healthcheck(url=url, send_start=True)
+    def job() -> None:
+        if not next(runs):
+            raise ValueError("failed run, retried right away")
+
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            job()
+        job()
+
+    ping_executor.submit(lambda: None).result()  # wait for the pending pings
+    assert targets == [f"{path}/start", f"{path}/fail", f"{path}/start", path] * 5
+
+
+def test_dropped_pings(
+    url: str, connection: MagicMock, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test that pings are dropped, not queued, when too many are pending."""
+
+    @healthcheck(url=url, send_start=True, await_pings=True)
+    def job() -> bool:
+        return True
+
+    with patch(
+        "healthchecks_decorator.decorator._pending_slots", threading.Semaphore(0)
+    ):
+        assert job()
+        assert job()
+    connection.request.assert_not_called()
+    # Logged once, not for each of the 4 dropped pings
+    assert [record.getMessage() for record in caplog.records] == [
+        "Dropping pings: 1024 pings are already pending"
+    ]
+
+    # Slots are given back once pings are sent
+    slots = threading.BoundedSemaphore(1)
+    with patch("healthchecks_decorator.decorator._pending_slots", slots):
+        assert job()
+        assert job()
+    assert connection.request.call_count == 4
+    assert [record.getMessage() for record in caplog.records][1:] == [
+        "Queueing pings again, after dropping 4"
+    ]
+
+
+FORK_SCRIPT = """
+import os
+from unittest.mock import MagicMock
+
+from healthchecks_decorator import decorator, healthcheck
+
+decorator._new_connection = factory = MagicMock()
+connection = factory.return_value
+connection.getresponse.return_value.status = 200
+
+
+@healthcheck(url="https://fake-hc.com/0000-1111-2222-3333", await_pings=True)
+def job():
+    return True
+
+
+assert job()  # the parent's ping threads are running now
+pid = os.fork()
+if pid == 0:  # child: report through the exit code
+    os._exit(0 if job() and connection.request.call_count == 2 else 1)
+_, status = os.waitpid(pid, 0)
+raise SystemExit(os.WEXITSTATUS(status) if os.WIFEXITED(status) else 1)
+"""
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_fork() -> None:
+    """Test that pings are still sent from a process forked after a ping."""
+    # In a fresh interpreter: forking the test runner itself is unsafe
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", FORK_SCRIPT], timeout=30, check=False
+    )
+    assert result.returncode == 0
+
+
+def test_reset_after_fork(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a forked child gets new ping threads, slots and connections."""
+    conn = MagicMock()
+    monkeypatch.setattr(decorator, "_executor", ping_executor)
+    monkeypatch.setattr(decorator, "_pending_slots", decorator._pending_slots)
+    monkeypatch.setattr(decorator, "_dropped_pings", 3)
+    monkeypatch.setattr(decorator, "_conn_lock", decorator._conn_lock)
+    monkeypatch.setattr(decorator, "_conn_cache", {("https", "fake-hc.com"): [conn]})
+    monkeypatch.setattr(decorator, "_addrinfo_cache", {("fake-hc.com", 443): []})
+
+    decorator._reset_after_fork()
+    assert decorator._executor is not ping_executor
+    assert decorator._pending_slots.acquire(blocking=False)
+    assert decorator._dropped_pings == 0
+    assert decorator._conn_lock.acquire(blocking=False)
+    assert decorator._conn_cache == {} and decorator._addrinfo_cache == {}
+    conn.close.assert_not_called()  # still used by the parent
+    decorator._executor.shutdown()
+
+
+def test_interpreter_shutdown(
+    url: str, path: str, connection: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that pings are sent synchronously once no thread can be started."""
+    monkeypatch.setattr(decorator, "_executor", ping_executor)
+    # As in atexit handlers: executors refuse new tasks
+    monkeypatch.setattr(futures_thread, "_shutdown", True)
+
+    @healthcheck(url=url, send_start=True)
+    def job() -> bool:
+        return True
+
+    assert job()
+    with batch_pings():
+        assert job()
+    expected_calls = [ping(f"{path}/start"), ping(path)] * 2
+    assert connection.request.call_args_list == expected_calls
+
+
+def test_batch_pings(url: str, path: str, connection: MagicMock) -> None:
+    """Test buffering final pings and sending them together."""
+
+    @healthcheck(url=url, send_start=True, await_pings=True)
+    def job() -> bool:
+        return True
+
+    @healthcheck(url=url + "/other", send_diagnostics=True)
+    def failing_job() -> bool:
+        raise ValueError("inner exception")
+
+    with batch_pings():
+        assert job()
+        with pytest.raises(ValueError):
+            failing_job()
+        # Only the start signal is sent right away
+        assert connection.request.call_args_list == [ping(f"{path}/start")]
+
+    assert connection.request.call_count == 3
+    connection.request.assert_has_calls(
+        [
+            ping(path),
+            ping(f"{path}/other/fail"),
+        ],
+        any_order=True,
+    )
+
+    # Nothing is buffered anymore
+    with batch_pings():
+        pass
+    assert job()
+    assert connection.request.call_count == 5
+
+
+def test_batch_pings_order(url: str, path: str, connection: MagicMock) -> None:
+    """Test that buffered pings of a same check are sent in order despite network jitter."""
+    targets: t.List[str] = []
+
+    def request(method: str, target: str, **kwargs: t.Any) -> None:
+        time.sleep(random.uniform(0, 0.02))  # noqa: S311
+        targets.append(target)
+
+    connection.request.side_effect = request
+
+    @healthcheck(url=url)
+    def job(fail: bool) -> None:
+        if fail:
+            raise ValueError("failed run, retried right away")
+
+    for _ in range(5):
+        with batch_pings():
+            with pytest.raises(ValueError):
+                job(True)
+            job(False)
+            healthcheck(url=url + "/other")(lambda: None)()
+        assert [target for target in targets if "other" not in target] == [
+            f"{path}/fail",
+            path,
+        ]
+        assert targets.count(f"{path}/other") == 1
+        targets.clear()
+
+
+def test_async_batch_pings(url: str, path: str, connection: MagicMock) -> None:
+    """Test buffering final pings of coroutines."""
+
+    @healthcheck(url=url, await_pings=True)
+    async def coroutine() -> bool:
+        return True
+
+    @healthcheck(url=url, await_pings=True)
+    async def coroutine_that_raises_exception() -> bool:
+        raise ValueError("inner exception")
+
+    async def sweep() -> None:
+        async with batch_pings():
+            await asyncio.gather(
+                coroutine(), coroutine_that_raises_exception(), return_exceptions=True
+            )
+            connection.request.assert_not_called()
+
+    asyncio.run(sweep())
+    connection.request.assert_has_calls(
+        [ping(path), ping(f"{path}/fail")],
+        any_order=True,
+    )
+
+
+def test_keep_alive(url: str, path: str, connection_factory: MagicMock) -> None:
+    """Test that consecutive pings to the same host reuse one connection."""
+    assert _http_request(url)
+    assert _http_request(url + "/start?create=1")
+    connection_factory.assert_called_once_with("https", "fake-hc.com", 10)
+    connection_factory.return_value.request.assert_has_calls(
+        [
+            ping(path),
+            ping(path + "/start?create=1"),
+        ]
+    )
+
+
+def test_reused_connection_timeout() -> None:
+    """Test that a reused connection gets the timeout of the new ping."""
+    idle, opened = decorator._new_connection("https", "fake-hc.com", 10), MagicMock()
+    decorator._conn_cache[("https", "fake-hc.com")] = [opened, idle]
+
+    assert decorator._acquire_connection("https", "fake-hc.com", 1) == (idle, True)
+    assert idle.timeout == 1
+    assert decorator._acquire_connection("https", "fake-hc.com", 5) == (opened, True)
+    assert opened.timeout == 5
+    opened.sock.settimeout.assert_called_once_with(5)
+    decorator._conn_cache.clear()
+
+
+def test_max_idle_connections(connection_factory: MagicMock) -> None:
+    """Test that only a few idle connections are kept per host."""
+    conns = [MagicMock() for _ in range(decorator._MAX_IDLE_CONNECTIONS + 1)]
+    for conn in conns:
+        decorator._release_connection("https", "fake-hc.com", conn)
+
+    assert decorator._conn_cache[("https", "fake-hc.com")] == conns[:-1]
+    conns[-1].close.assert_called_once()
+
+
+def test_stale_connection(url: str, connection_factory: MagicMock) -> None:
+    """Test that a connection closed while idle is replaced transparently."""
+    stale, fresh = MagicMock(), MagicMock()
+    stale.getresponse.return_value.status = 200
+    fresh.getresponse.return_value.status = 200
+    connection_factory.side_effect = [stale, fresh]
+
+    assert _http_request(url)
+    stale.request.side_effect = RemoteDisconnected("closed")
+    assert _http_request(url)
+    stale.close.assert_called_once()
+    assert fresh.request.call_count == 1
+
+
+def test_stale_connection_single_retry(url: str, connection_factory: MagicMock) -> None:
+    """Test that a stale connection is retried once, on a new connection."""
+    stale = [MagicMock() for _ in range(2)]
+    fresh = MagicMock()
+    fresh.request.side_effect = BrokenPipeError()
+    decorator._conn_cache[("https", "fake-hc.com")] = list(stale)
+    connection_factory.return_value = fresh
+
+    stale[-1].request.side_effect = ConnectionResetError()
+    assert _http_request(url) is False
+    assert fresh.request.call_count == 1
+    stale[0].request.assert_not_called()  # not tried: the retry is on a new connection
+
+
+def test_timeout_not_retried(url: str, connection_factory: MagicMock) -> None:
+    """Test that a timeout is not retried, as the ping may have been received."""
+    reused = MagicMock()
+    reused.getresponse.side_effect = socket.timeout()
+    decorator._conn_cache[("https", "fake-hc.com")] = [reused]
+
+    assert _http_request(url) is False
+    reused.close.assert_called_once()
+    connection_factory.assert_not_called()
+
+
+def test_headers(url: str, connection: MagicMock) -> None:
+    """Test that pings ask to keep the connection alive and identify themselves."""
+    assert _http_request(url)
+    headers = connection.request.call_args.kwargs["headers"]
+    assert headers["Connection"] == "keep-alive"
+    assert headers["User-Agent"].startswith("healthchecks-decorator/")
+
+    with patch(
+        "healthchecks_decorator.decorator.metadata.version",
+        side_effect=metadata.PackageNotFoundError,
+    ):
+        assert decorator._user_agent() == "healthchecks-decorator/unknown"
+
+
+def test_new_connection() -> None:
+    """Test that connections match the URL scheme and are opened lazily."""
+    https_conn = decorator._new_connection("https", "fake-hc.com", 10)
+    http_conn = decorator._new_connection("http", "fake-hc.com:8000", 5)
+    assert isinstance(https_conn, HTTPSConnection)
+    assert isinstance(http_conn, HTTPConnection)
+    assert not isinstance(http_conn, HTTPSConnection)
+    assert https_conn._create_connection is decorator._create_connection  # type: ignore[attr-defined]
+    assert (http_conn.host, http_conn.port, http_conn.timeout) == (
+        "fake-hc.com",
+        8000,
+        5,
+    )
+    assert https_conn.sock is None and http_conn.sock is None
+
+
+@pytest.fixture
+def addrinfo() -> t.Iterator[MagicMock]:
+    """Patch name resolution with two addresses and drop cached ones afterwards."""
+    with patch("socket.getaddrinfo") as getaddrinfo:
+        getaddrinfo.return_value = [
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("::1", 443, 0, 0)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 443)),
+        ]
+        yield getaddrinfo
+    decorator._addrinfo_cache.clear()
+
+
+def test_preresolved_connection(addrinfo: MagicMock) -> None:
+    """Test that each host is resolved once, trying its addresses in order."""
+    with patch("socket.socket") as socket_mock:
+        ipv6_sock, ipv4_sock = MagicMock(), MagicMock()
+        ipv6_sock.connect.side_effect = ConnectionRefusedError()
+        socket_mock.side_effect = [ipv6_sock, ipv4_sock, ipv4_sock]
+
+        address = ("fake-hc.com", 443)
+        assert decorator._create_connection(address, 10, ("0.0.0.0", 0)) is ipv4_sock
+        ipv6_sock.close.assert_called_once()
+        ipv4_sock.bind.assert_called_once_with(("0.0.0.0", 0))
+        ipv4_sock.settimeout.assert_called_with(10)
+        ipv4_sock.connect.assert_called_once_with(("127.0.0.1", 443))
+
+        # Cached: the next connection starts from the first address right away
+        socket_mock.side_effect = [ipv4_sock]
+        assert decorator._create_connection(address, 10) is ipv4_sock
+        addrinfo.assert_called_once_with("fake-hc.com", 443, type=socket.SOCK_STREAM)
+
+
+def test_preresolved_connection_error(addrinfo: MagicMock) -> None:
+    """Test that addresses are resolved again once none of them is reachable."""
+    address = ("fake-hc.com", 443)
+    with patch("socket.socket") as socket_mock:
+        socket_mock.return_value.connect.side_effect = ConnectionRefusedError()
+        with pytest.raises(ConnectionRefusedError):
+            decorator._create_connection(address, 10)
+    assert address not in decorator._addrinfo_cache
+
+    addrinfo.return_value = []
+    with pytest.raises(OSError, match="No address found"):
+        decorator._create_connection(address, 10)
+
+
+def test_preresolved_connection_ttl(addrinfo: MagicMock) -> None:
+    """Test that resolved addresses expire."""
+    address = ("fake-hc.com", 443)
+    with patch("socket.socket"):
+        decorator._create_connection(address, 10)
+        decorator._create_connection(address, 10)
+        assert addrinfo.call_count == 1
+
+        expires, resolved = decorator._addrinfo_cache[address]
+        decorator._addrinfo_cache[address] = (
+            expires - decorator._ADDRINFO_TTL,
+            resolved,
+        )
+        decorator._create_connection(address, 10)
+        assert addrinfo.call_count == 2
+
+
+def test_preresolved_connection_tls_error(
+    url: str, addrinfo: MagicMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that addresses are resolved again when a connection fails after connecting."""
+    conn = decorator._new_connection("https", "fake-hc.com", 10)
+    conn._context = MagicMock()  # type: ignore[attr-defined]
+    conn._context.wrap_socket.side_effect = ssl.SSLError()  # type: ignore[attr-defined]
+    monkeypatch.setattr(decorator, "_new_connection", lambda *args: conn)
+
+    with patch("socket.socket"):
+        assert _http_request(url) is False
+    addrinfo.assert_called_once()
+    assert ("fake-hc.com", 443) not in decorator._addrinfo_cache
+
+
+def test_http_error_status(url: str, connection: MagicMock) -> None:
+    """Test that an HTTP error status is reported as a failed ping."""
+    connection.getresponse.return_value.status = 404
+    assert _http_request(url) is False
+
+    # An invalid response is no reason to resolve the host again
+    connection.getresponse.side_effect = LineTooLong("status line")
+    decorator._addrinfo_cache[(connection.host, connection.port)] = (0.0, [])
+    assert _http_request(url) is False
+    assert (connection.host, connection.port) in decorator._addrinfo_cache
+    decorator._addrinfo_cache.clear()
+
+
+def test_wrong_url_schema() -> None:
+    """Test that only HTTP(S) endpoints are requested."""
+    with pytest.raises(ValueError):
+        _http_request("file:///tmp/localfile.txt")
+    with pytest.raises(ValueError):
+        _http_request("https:/fake-hc.com")
+
+
+def test_url_schema_case(url: str, path: str, connection: MagicMock) -> None:
+    """Test that URL schemes are case-insensitive."""
+    assert _http_request(url.replace("https", "HTTPS"))
+    assert connection.request.call_args_list == [ping(path)]
 
 
 def test_url_with_query() -> None:
@@ -133,8 +776,27 @@ def test_url_with_query() -> None:
         == "https://hc-ping.com/fqOOd6-F4MMNuCEnzTU01w/db-backups/fail?create=1"
     )
 
+    # Trailing slash and fragment
+    c = HealthcheckConfig(
+        url="https://fake-hc.com/uuid/?create=1#x",
+        send_start=True,
+        send_diagnostics=False,
+    )
+    assert c.start_url == "https://fake-hc.com/uuid/start?create=1#x"
+
 
-def test_invalid_url() -> None:
+def test_url_parsing_cache(url: str) -> None:
+    """Test that decorating several functions with one URL parses it once."""
+    healthcheck(url=url)(lambda: True)
+    sub_url_hits = decorator._build_sub_urls.cache_info().hits
+    endpoint_hits = decorator._parse_endpoint.cache_info().hits
+
+    healthcheck(url=url)(lambda: True)
+    assert decorator._build_sub_urls.cache_info().hits == sub_url_hits + 1
+    assert decorator._parse_endpoint.cache_info().hits == endpoint_hits + 3
+
+
+def test_invalid_url(caplog: pytest.LogCaptureFixture) -> None:
     """Test invalid URL schemas."""
     args = dict(send_start=True, send_diagnostics=False)
 
@@ -153,6 +815,10 @@ def test_invalid_url() -> None:
         bool(HealthcheckConfig(url="ftp://fake-hc.com/0000-1111-2222-3333", **args))
         is False
     )
+    assert caplog.records[-1].name == "healthchecks_decorator.decorator"
+    assert caplog.records[-1].getMessage() == (
+        "Invalid URL scheme for URL: ftp://fake-hc.com/0000-1111-2222-3333"
+    )
 
     # No scheme
     assert bool(HealthcheckConfig(url="dkakasdkjdjakdjadjfalskdjfalk", **args)) is False
@@ -164,23 +830,30 @@ def test_invalid_url() -> None:
     assert bool(HealthcheckConfig(url=123.23, **args)) is False  # type: ignore
 
 
-def test_envvars(url: str) -> None:
+def test_envvars(url: str, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test configuring with env vars."""
+    for option in ("url", "send_diagnostics", "send_start", "await_pings"):
+        monkeypatch.delenv(f"HEALTHCHECK_{option.upper()}", raising=False)
+
     # No explicit settings + no env vars => defaults
     c = HealthcheckConfig(url=None, send_diagnostics=None, send_start=None)
     assert c.send_diagnostics is False
     assert c.send_start is False
+    assert c.await_pings is False
     assert c.url is None
+    assert not hasattr(c, "__dict__")  # plain slots, resolved once
 
     # Set some env vars
 
     # No explicit settings + env vars => env vars
-    environ["HEALTHCHECK_URL"] = url
-    environ["HEALTHCHECK_SEND_DIAGNOSTICS"] = "TRue"  # case should not affect
-    environ["HEALTHCHECK_SEND_START"] = "1"  # this should alse be True
+    monkeypatch.setenv("HEALTHCHECK_URL", url)
+    monkeypatch.setenv("HEALTHCHECK_SEND_DIAGNOSTICS", "TRue")  # case should not affect
+    monkeypatch.setenv("HEALTHCHECK_SEND_START", "1")  # this should alse be True
+    monkeypatch.setenv("HEALTHCHECK_AWAIT_PINGS", "true")
     c = HealthcheckConfig(url=None, send_diagnostics=None, send_start=None)
     assert c.send_diagnostics is True
     assert c.send_start is True
+    assert c.await_pings is True
     assert c.url == url
 
     # explicit settings + env vars => explicit settings
@@ -189,7 +862,3 @@ def test_envvars(url: str) -> None:
     assert c.send_diagnostics is False
     assert c.send_start is False
     assert c.url == other_url
-
-    del environ["HEALTHCHECK_URL"]
-    del environ["HEALTHCHECK_SEND_DIAGNOSTICS"]
-    del environ["HEALTHCHECK_SEND_START"]